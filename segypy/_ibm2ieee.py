@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+Optional Numba kernel for IBM-float to IEEE conversion.
+
+The pure-NumPy conversion in segypy allocates several intermediate
+arrays (sign, exponent, mantissa) and makes one pass per operation.
+When Numba is available, this kernel fuses the whole conversion into a
+single parallel pass over the samples. segypy imports ibm2ieee_batch
+from here and falls back to the NumPy version when it is None.
+"""
+
+try:
+  import numba
+except ImportError:
+  numba = None
+
+if numba is None:
+  ibm2ieee_batch = None
+else:
+  @numba.njit(parallel=True, fastmath=True, cache=True)
+  def ibm2ieee_batch(raw, out):
+    """
+    i raw : array 1D, numpy uint32, native order, IBM float bit patterns
+    o out : array 1D, numpy float32, preallocated, same size as raw
+    Fused IBM to IEEE conversion over all samples in parallel.
+    """
+    for i in numba.prange(raw.size):
+      r = raw[i]
+      sign = -1.0 if r & 0x80000000 else 1.0
+      exponent = numba.int32((r >> 24) & 0x7f) - 64
+      mantissa = (r & 0x00ffffff) * (1.0 / 16777216.0)
+      out[i] = sign * mantissa * 16.0 ** exponent
@@ -16,11 +16,17 @@ __version__ = '0.5.0'
 
 import struct
 import collections
+import mmap
 from datetime import datetime
 import numpy as np
 import warnings
 #import os
 
+try:
+  from ._ibm2ieee import ibm2ieee_batch # None when Numba is missing
+except ImportError:
+  ibm2ieee_batch = None
+
 endian = '>' # Big Endian
 #endian = '<' # Little Endian
 #endian = '=' # Native
@@ -47,12 +53,27 @@ dtype2ctype = {
   'char'   : 'c',
   'uchar'  : 'B'}
 
+# Table for data type to big-endian numpy dtype
+dtype2np = {
+  'int32'  : '>i4',
+  'uint32' : '>u4',
+  'int16'  : '>i2',
+  'uint16' : '>u2',
+  'float32': '>f4',
+  'double' : '>f8',
+  'char'   : 'i1',
+  'uchar'  : 'u1'}
+
+# Cache of compiled struct.Struct objects, keyed by format string, so
+# single-value pack/unpack does not recompile the format on every call
+_PACKERS = {}
+
 bytes_STFH = 3200
 bytes_SBFH = 400
 bytes_SFH = 3600
 bytes_STH = 240
 
-nspb = 100000000 # 100 million samples per block for unpack
+ntpb = 65536 # traces per block for write buffering
 
 # Initialize SEGY binary file header 
 SH_def = collections.OrderedDict()
@@ -219,7 +240,7 @@ STH_def["MuteTimeStart"] = {"pos": 110 , "type": "int16"}
 STH_def["MuteTimeEND"] = {"pos": 112 , "type": "int16"}
 STH_def["ns"] = {"pos": 114 , "type": "uint16"}
 STH_def["dt"] = {"pos": 116 , "type": "uint16"}
-STH_def["GainType"] = {"pos": 119 , "type": "int16"}
+STH_def["GainType"] = {"pos": 118 , "type": "int16"}
 STH_def["GainType"]["descr"] = {0: {
   1: "Fixes", 
   2: "Binary",
@@ -288,7 +309,7 @@ STH_def["cdpX"] = {"pos": 180 , "type": "int32"}
 STH_def["cdpY"] = {"pos": 184 , "type": "int32"}
 STH_def["Inline3D"] = {"pos": 188 , "type": "int32"}
 STH_def["Crossline3D"] = {"pos": 192 , "type": "int32"}
-STH_def["ShotPoint"] = {"pos": 192 , "type": "int32"}
+STH_def["ShotPoint"] = {"pos": 196 , "type": "int32"}
 STH_def["ShotPointScalar"] = {"pos": 200 , "type": "int16"}
 STH_def["TraceValueMeasurementUnit"] = {"pos": 202 , "type": "int16"}
 STH_def["TraceValueMeasurementUnit"]["descr"] = {1: {
@@ -340,6 +361,63 @@ STH_def["SourceMeasurementUnit"]["descr"] = {1: {
 STH_def["UnassignedInt1"] = {"pos": 232 , "type": "int32"}
 STH_def["UnassignedInt2"] = {"pos": 236 , "type": "int32"}
 
+def _buildHeaderStruct(hdr_def, bytes_total, pos0=0):
+  """
+  i hdr_def : ordered dictionary, header definition with pos and type
+  i bytes_total : integer, total byte size of the packed header
+  i pos0 : integer, byte position of the header start in the file
+  o hdr_struct : struct.Struct, one format covering the whole header
+  o hdr_fields : list, header names in byte order
+  Precompile one Struct over a whole header block, with 'x' pad bytes
+  for unassigned gaps, so all fields pack or unpack in a single C call
+  instead of one struct call per field.
+  """
+  cformat = endian
+  hdr_fields = []
+  offset = 0
+  for key in sorted(hdr_def.keys(), key=lambda k: hdr_def[k]["pos"]):
+    pos = hdr_def[key]["pos"] - pos0
+    cformat += 'x' * (pos - offset)
+    cformat += dtype2ctype[hdr_def[key]["type"]]
+    hdr_fields.append(key)
+    csize = dtype2csize[hdr_def[key]["type"]]
+    number = hdr_def[key].get("n", 1)
+    # Only the first element of an "n"-element field carries a value,
+    # the rest are written as zero padding.
+    cformat += 'x' * (csize * (number - 1))
+    offset = pos + csize * number
+  cformat += 'x' * (bytes_total - offset)
+  hdr_struct = struct.Struct(cformat)
+  return hdr_struct, hdr_fields
+
+# Precompiled structs over the 400-byte binary file header and the
+# 240-byte trace header
+SBFH_STRUCT, SBFH_FIELDS = _buildHeaderStruct(SH_def, bytes_SBFH, bytes_STFH)
+STH_STRUCT, STH_FIELDS = _buildHeaderStruct(STH_def, bytes_STH)
+
+def _buildHeaderDtype(hdr_def, bytes_total, pos0=0):
+  """
+  i hdr_def : ordered dictionary, header definition with pos and type
+  i bytes_total : integer, total byte size of the packed header
+  i pos0 : integer, byte position of the header start in the file
+  o hdr_dtype : numpy dtype, structured, one field per header
+  Build a numpy structured dtype matching a header definition, with
+  exact big-endian field widths at their byte offsets. Unassigned gaps
+  and the tail of "n"-element fields stay zero padding.
+  """
+  names = []
+  formats = []
+  offsets = []
+  for key in sorted(hdr_def.keys(), key=lambda k: hdr_def[k]["pos"]):
+    names.append(key)
+    formats.append(dtype2np[hdr_def[key]["type"]])
+    offsets.append(hdr_def[key]["pos"] - pos0)
+  return np.dtype({"names": names, "formats": formats,
+                   "offsets": offsets, "itemsize": bytes_total})
+
+# Structured dtype over the 240-byte trace header
+STH_NP_DTYPE = _buildHeaderDtype(STH_def, bytes_STH)
+
 def image(Data):
   """
   i Data : 2D array, nsample by ntrace?
@@ -354,29 +432,39 @@ def image(Data):
 
 def wiggle(Data, dt=4, skipt=1, maxval=8, lwidth=.1):
   """
-  i Data : 2D array, nsample by ntrace?
+  i Data : 2D array, nsample by ntrace
   i dt : float, trace sampling interval, e.g. 4ms or 5m.
   i skipt : integer, number of traces to skip plot
   i maxval : float, amplitude scalar
   i lwidth : float, line width
   o Plot window
-  Plot traces in wiggle form
+  Plot traces in wiggle form.
+  All wiggle curves go into one LineCollection and all filled positive
+  lobes into one PolyCollection, so matplotlib is called twice instead
+  of once per trace.
   """
   import matplotlib.pyplot as plt
-    
-  ntraces, ns = Data.shape
-  t = range(ns) * dt # vertical axis, time or depth
-
-  for i in range(0, ntraces, skipt):
-    trace = Data[:,i]
-    #trace[0] = 0
-    #trace[ns-1] = 0  
-    plt.plot(i+trace/maxval, t, color='black', linewidth=lwidth)
-    #for a in range(len(trace)):
-    #  if (trace[a] < 0):
-    #    trace[a] = 0 
-    #plt.fill(i+Data[:,i]/maxval, t, color='k', facecolor='g')
-    plt.fill(i+trace/maxval, t, 'k', linewidth=0)
+  from matplotlib.collections import LineCollection, PolyCollection
+
+  ns, ntraces = Data.shape
+  t = np.arange(ns) * dt # vertical axis, time or depth
+
+  offsets = np.arange(0, ntraces, skipt) # horizontal trace positions
+  x = offsets + Data[:, ::skipt] / maxval # (ns, nplot) wiggle curves
+  tgrid = np.broadcast_to(t[:, np.newaxis], x.shape)
+
+  segments = np.stack([x.T, tgrid.T], axis=-1)
+  lines = LineCollection(segments, colors='black', linewidths=lwidth)
+
+  # Clip each curve at its baseline so only positive lobes are filled
+  xpos = np.maximum(x.T, offsets[:, np.newaxis])
+  fills = PolyCollection(np.stack([xpos, tgrid.T], axis=-1),
+                         facecolors='black', linewidths=0)
+
+  ax = plt.gca()
+  ax.add_collection(lines)
+  ax.add_collection(fills)
+  ax.autoscale_view()
   plt.grid(True)
   plt.show()
 
@@ -443,27 +531,25 @@ def setSegyTraceHeaders(mySTH=None, ntraces=100, ns=100, dt=1000):
   i ntraces : integer, number of traces
   i ns : integer, number of samples per trace
   i dt : integer, sample interval in microsecond or millimeter
-  o STH : dictionary, Segy trace header
+  o STH : array, numpy structured with dtype STH_NP_DTYPE
   Set Segy trace header values. Prepare for write Segy.
-  """
-  STH = {}
-  for key in STH_def.keys(): 
-    STH[key] = np.zeros(ntraces, dtype=np.int32)
-      
-  for a in range(ntraces):      
-    STH["TraceSequenceLine"][a] = a + 1
-    STH["TraceSequenceFile"][a] = a + 1
-    STH["FieldRecord"][a] = 1000
-    STH["TraceNumber"][a] = a + 1
-    STH["ns"][a] = ns
-    STH["dt"][a] = dt
+  One structured record per trace replaces the old dict of 91 int32
+  arrays: every field keeps its exact spec width at its byte offset,
+  and STH[key] still yields one value per trace.
+  """
+  STH = np.zeros(ntraces, dtype=STH_NP_DTYPE)
+  STH["TraceSequenceLine"] = np.arange(1, ntraces + 1)
+  STH["TraceSequenceFile"] = np.arange(1, ntraces + 1)
+  STH["FieldRecord"] = 1000
+  STH["TraceNumber"] = np.arange(1, ntraces + 1)
+  STH["ns"] = ns
+  STH["dt"] = dt
 
   # Overwrite using user-supplied header values
   if mySTH is not None:
     for key in mySTH.keys():
       print('Custom added key to trace header:', key)
-      for a in range(ntraces):
-        STH[key][a] = mySTH[key][a]
+      STH[key] = mySTH[key]
 
   return STH
 
@@ -487,23 +573,27 @@ def getSegyTraceHeader(SH, data, TH_name, TH_dict=None, itrace=0):
 
   print('Reading trace header:', TH_name, TH_pos+1, TH_format)
   ntraces = SH["ntraces"]
-  ns = SH["ns"]
-  bps = getBytePerSample(SH)
-  traceByteSize = bytes_STH + ns * bps
+  traceByteSize = SH["_traceByteSize"]
 
   if itrace == 0 : # get all traces
-    TH_value = np.zeros(ntraces, dtype=TH_format)
-    for itrace in range(ntraces):
-      pos = bytes_SFH + traceByteSize * itrace + TH_pos
-      TH_value[itrace] = getValue(data, pos, TH_format, endian)
+    # One strided view reads this header from every trace at once,
+    # stepping traceByteSize bytes between values. astype converts
+    # big-endian to native and copies out of the file buffer.
+    arr = np.ndarray(shape=(ntraces,), dtype=dtype2np[TH_format],
+                     buffer=data, offset=bytes_SFH + TH_pos,
+                     strides=(traceByteSize,))
+    TH_value = arr.astype(TH_format)
   else : # get one trace
     pos = bytes_SFH + traceByteSize * (itrace - 1) + TH_pos
-    TH_value = getValue(data, pos, TH_format, endian)
+    TH_value = getScalar(data, pos, TH_format, endian)
 
   # If dt in STH is zero, read from SBFH.
   if TH_name == "dt" :
-    if TH_value[0] == 0 :
-      TH_value[:] = SH["dt"]
+    if itrace == 0 :
+      if TH_value[0] == 0 :
+        TH_value[:] = SH["dt"]
+    elif TH_value == 0 :
+      TH_value = SH["dt"]
 
   return TH_value
 
@@ -549,41 +639,49 @@ def readSegy(filename, TH_dict=None, TH_only=False) :
   print('Done read trace headers at', datetime.now())
 
   if TH_only is True :
-    return SH, SegyTraceHeaders  
-  else : 
-    bps = getBytePerSample(SH)
-    ndummy_samples = int(bytes_STH / bps)
-    index = bytes_SFH
-    filesize = len(data)
-    nd = int((filesize - bytes_SFH) / bps)
-
-    revno = getRevisionNumber(SH)
+    data.close()
+    return SH, SegyTraceHeaders
+  else :
     dsf = SH["DataSampleFormat"]
-    DataDescr = SH_def["DataSampleFormat"]["descr"][revno][dsf]
+    DataDescr = SH_def["DataSampleFormat"]["descr"][SH["_revno"]][dsf]
     print("DataSampleFormat = " + str(dsf) + ', ' + DataDescr)
 
-    dtype = SH_def["DataSampleFormat"]["datatype"][revno][dsf]
-    Data = getValue(data, index, dtype, endian, nd)
+    # One dispatch per file: the reader bound to this data sample
+    # format decodes all samples, with no dtype branches inside.
+    reader = _SAMPLE_READERS[SH["_dtype"]]
+    Data = reader(data, SH["ntraces"], SH["ns"], SH["_traceByteSize"])
     print('Done read trace samples at', datetime.now())
-  
-    ntraces = SH["ntraces"]
-    nsDummyTrace = SH['ns'] + ndummy_samples
-    Data = np.reshape(Data, (ntraces, nsDummyTrace))
-    #print(Data.dtype)
-    #Data = Data.astype('float32') # cast all types to 32-bit float
-
-    # Strip off header dummy data
-    Data = Data[:,ndummy_samples:nsDummyTrace]
-    
-    # Deal with 8-bit integer
+    data.close()
+
+    # Deal with 8-bit integer: the two's complement bit pattern is
+    # identical, so reinterpret in place instead of masking and
+    # subtracting 256 from the high half.
     if dsf == 8:
-      #for i in np.arange(ntraces):
-      #  for j in np.arange(SH['ns']):
-      #    if Data[i][j] > 128:
-      #      Data[i][j] = Data[i][j] - 256
-      Data[Data > 128] -= 256
-  
-    return Data, SH, SegyTraceHeaders  
+      Data = Data.view(np.int8)
+
+    return Data, SH, SegyTraceHeaders
+
+def readSegyMany(filenames, nworkers=4, TH_dict=None, TH_only=False):
+  """
+  i filenames : list, Segy filenames
+  i nworkers : integer, number of files read concurrently
+  i TH_dict : dictionary, Trace header byte position and data type
+  i TH_only : bool, flag for reading headers only.
+  o results : dictionary, filename to the readSegy output tuple
+  Read many Segy files with their file I/O overlapped.
+  Page faults on the mapped files and the numpy decode kernels release
+  the GIL, so a small thread pool keeps several reads in flight at
+  once. This helps batch pipelines over many small files; for a single
+  large file the mmap path in readSegy is already the fast route.
+  """
+  import concurrent.futures
+  results = {}
+  with concurrent.futures.ThreadPoolExecutor(nworkers) as pool:
+    futures = {pool.submit(readSegy, filename, TH_dict, TH_only):
+               filename for filename in filenames}
+    for future in concurrent.futures.as_completed(futures):
+      results[futures[future]] = future.result()
+  return results
 
 def readSegyTrace(filename, TH_dict=None, itrace=1):
   """
@@ -596,36 +694,47 @@ def readSegyTrace(filename, TH_dict=None, itrace=1):
   SH, data = getSegyHeader(filename)
   SegyTraceHeaders = getSegyTraceHeaders(SH, data, TH_dict, itrace)
 
-  bps = getBytePerSample(SH)
   ns = SH['ns'] # number of samples per trace
-  bytesTrace = bytes_STH + ns * bps
-  index = bytes_SFH + (itrace - 1) * bytesTrace + bytes_STH
-  revno = getRevisionNumber(SH)
-  dsf = SH["DataSampleFormat"]
-  dtype = SH_def["DataSampleFormat"]["datatype"][revno][dsf]
+  index = bytes_SFH + (itrace - 1) * SH["_traceByteSize"] + bytes_STH
+  dtype = SH["_dtype"]
   SegyTraceData = getValue(data, index, dtype, endian, ns)
+  data.close() # getValue returned a fresh native-order array
+  if SH["DataSampleFormat"] == 8:
+    SegyTraceData = SegyTraceData.view(np.int8) # see readSegy
   return SegyTraceHeaders, SegyTraceData
 
 def getSegyHeader(filename):
   """
   i filename : string, Segy filename
   o SH : dictionary, Segy binary file header
-  o data : byte object, from read the file in binary mode
+  o data : mmap object, the file mapped read-only into memory
   Read Segy binary file headers.
+  The file is memory-mapped rather than read into a bytes copy, so the
+  OS pages data in on demand and files larger than RAM can be read.
+  Callers should close the mapping when done with it.
   """
-  data = open(filename, 'rb').read()
+  fd = open(filename, 'rb')
+  data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+  fd.close() # the mapping keeps the file alive
   SH = {'filename': filename}
-  for key in SH_def.keys(): 
-    pos = SH_def[key]["pos"]
-    fmt = SH_def[key]["type"]
-    SH[key] = getValue(data, pos, fmt, endian)   
+  # All binary-header fields in one precompiled-struct call, instead of
+  # one unpack per field
+  SH.update(zip(SBFH_FIELDS, SBFH_STRUCT.unpack_from(data, bytes_STFH)))
 
   bps = getBytePerSample(SH)
   ns = SH['ns']
   traceByteSize = bytes_STH + ns * bps
   filesize = len(data)
   ntraces = (filesize - bytes_SFH) / traceByteSize
-  SH["ntraces"] = int(ntraces) 
+  SH["ntraces"] = int(ntraces)
+
+  # Cache constants derived from revno and dsf, so the per-trace hot
+  # paths do not repeat the nested dictionary lookups for every call
+  SH["_revno"] = getRevisionNumber(SH)
+  SH["_bps"] = bps
+  SH["_dtype"] = SH_def["DataSampleFormat"]["datatype"] \
+    [SH["_revno"]][SH["DataSampleFormat"]]
+  SH["_traceByteSize"] = traceByteSize
 
   return SH, data
 
@@ -682,50 +791,33 @@ def writeSegyStructure(filename, Data, STFH, SH, STH):
   DataDescr = SH_def["DataSampleFormat"]["descr"][revno][dsf]
   print("Write DataSampleFormat = " + str(dsf) + ' ' + DataDescr)
 
-  # Write binary file header
-  SH_ByteArray = bytearray()
-  for key in SH_def.keys():
-    dtype = SH_def[key]["type"]
-    value = SH[key]
-    bytesObject = packValue(value, dtype, endian)
-    SH_ByteArray.extend(bytesObject)
+  # Write binary file header, all fields in one precompiled-struct call
+  SH_ByteArray = SBFH_STRUCT.pack(*(SH[key] for key in SBFH_FIELDS))
   index = bytes_STFH
   f.seek(index)
   f.write(SH_ByteArray)
 
-  index = index + bytes_SBFH
   dtype = SH_def['DataSampleFormat']['datatype'][revno][dsf]
-  ctype = dtype2ctype[dtype]
-  bps = SH_def['DataSampleFormat']['bps'][revno][dsf]
-  traceByteSize = bytes_STH + ns * bps
-
-  for itrace in range(ntraces):
-
-    if itrace % 10000 == 0 :
-      print('Total traces %i, Writing trace %i, Progress = %6.2f' %
-        (ntraces, itrace, itrace/ntraces*100))
-
-    # When should do flush and sync? Not system automatic?
-    #if itrace % 40000 == 0 :
-    #  f.flush() # flush internal buffer to OS buffer
-    #  os.fsync(f.fileno()) # push OS buffer to disk      
-
-    TraceByteArray = bytearray()
-    for key in STH_def.keys(): # ordered dictionary
-      dtype = STH_def[key]["type"]
-      value = STH[key][itrace]
-      bytesObject = packValue(value, dtype, endian)
-      TraceByteArray.extend(bytesObject)
-
-    aray1d = Data[:, itrace]
-    cformat = endian + str(ns) + ctype
-    aray1dPack = struct.pack(cformat, *aray1d)
-    TraceByteArray.extend(aray1dPack)
-
-    # Write to file once per trace
-    f.seek(index)
-    f.write(TraceByteArray)
-    index += traceByteSize
+  np_dtype = dtype2np[dtype]
+
+  # Lay out the file body (trace headers interleaved with samples) in a
+  # structured array and write it in blocks of ntpb traces, instead of
+  # packing and writing one trace at a time. The file is written
+  # strictly sequentially, so no seek is needed. Blocking bounds the
+  # staging buffer for files larger than RAM.
+  trace_dtype = np.dtype([('hdr', STH_NP_DTYPE), ('samples', np_dtype, (ns,))])
+  nblock = int((ntraces - 1) / ntpb) + 1
+  for i in range(nblock) :
+    if nblock > 1 :
+      print('Total blocks %i, Writing block %i' % (nblock, i+1))
+    t1 = ntpb * i # trace index 1
+    t2 = min(t1 + ntpb, ntraces) # trace index 2
+    body = np.zeros(t2 - t1, dtype=trace_dtype)
+    hdrs = body['hdr']
+    for key in STH_FIELDS:
+      hdrs[key] = STH[key][t1:t2] # bulk copy of one field per block
+    body['samples'] = Data[:, t1:t2].T # cast and byteswap happen here, in C
+    f.write(body.tobytes())
 
   f.close()
 
@@ -742,10 +834,27 @@ def packValue(value, dtype='int32', endian='>', number=1):
   calling file write once for all headers.
   Call fh.seek and fh.write every time for each header is too costly.
   """
-  ctype = dtype2ctype[dtype]
-  cformat = endian + ctype * number
-  bytesObject = struct.pack(cformat, value)
-  return bytesObject
+  cformat = endian + dtype2ctype[dtype] * number
+  packer = _PACKERS.get(cformat)
+  if packer is None :
+    packer = _PACKERS[cformat] = struct.Struct(cformat)
+  return packer.pack(value)
+
+def getScalar(data, index, dtype='int32', endian='>'):
+  """
+  i data : bytes object, returned by read file in binary mode.
+  i index : integer, the starting byte location
+  i dtype : string, data type, e.g. int32, int16, uint16.
+  i endian : character, byte order
+  o Value : value, one Python number
+  Read a single value without the array setup getValue pays per call.
+  Reuses the compiled-struct cache shared with packValue.
+  """
+  cformat = endian + dtype2ctype[dtype]
+  packer = _PACKERS.get(cformat)
+  if packer is None :
+    packer = _PACKERS[cformat] = struct.Struct(cformat)
+  return packer.unpack_from(data, index)[0]
 
 def getValue(data, index, dtype='int32', endian='>', number=1):
   """
@@ -755,50 +864,63 @@ def getValue(data, index, dtype='int32', endian='>', number=1):
   i endian : character, byte order
   i number : integer, the number of numbers in data
   o Value : value, when only one number.
-  o Value : tuple, struct.unpack returns a tuple
+  o Value : array, numpy, native byte order, independent of data.
   """
   if (dtype == 'ibm'): # IBM float data
-    Value = np.empty(number, dtype='float32')
-    for i in np.arange(number):
-      index_ibm = i * 4 + index
-      Value[i] = ibm2ieee(data[index_ibm:index_ibm+4])
+    Value = ibm2ieee_vec(data, index, number)
   else: # all other types of data
-
-    ctype = dtype2ctype[dtype]
-    csize = dtype2csize[dtype]
-    Value = np.empty(number, dtype=dtype)
-
-    # Unpack all at once
-    # For files of size close to memory, MemoryError.
-    #cformat = endian + ctype * number
-    #index_end = index + csize * number
-    #Value = struct.unpack(cformat, data[index:index_end])
-
-    nblock = int(number / nspb) + 1
-    for i in range(nblock) :
-      if nblock > 1 :
-        print('Total blocks %i, Current block %i' % (nblock, i+1))
-      if i == (nblock - 1) :
-        ns = number % nspb
-      else :
-        ns = nspb
-      si1 = nspb * i # sample index 1
-      si2 = si1 + ns # sample index 2
-      bi1 = index + si1 * csize # byte index 1
-      bi2 = bi1 + ns * csize    # byte index 2
-      cformat = endian + ctype * ns
-      Value[si1:si2] = struct.unpack(cformat, data[bi1:bi2])
+    # One C-level read of the whole contiguous sample section, with no
+    # per-sample Python objects as with struct.unpack. byteswap makes
+    # the one copy out of the buffer and converts to native order in
+    # the same pass; the view only relabels the dtype.
+    Value = np.frombuffer(data, dtype=dtype2np[dtype], count=number,
+                          offset=index)
+    Value = Value.byteswap().view(Value.dtype.newbyteorder())
 
   if number == 1:
     return Value[0]
   else:
     return Value
 
+def ibm2ieee_vec(data, index=0, number=1):
+  """
+  i data : bytes object, returned by read file in binary mode.
+  i index : integer, the starting byte location
+  i number : integer, the number of IBM floats to convert
+  o Value : array, numpy float32
+  Convert a whole block of IBM floats to IEEE at once.
+  The sign, exponent and mantissa are extracted with bitwise operations
+  on the full array, so no Python-level loop over samples is needed.
+  """
+  raw = np.frombuffer(data, dtype='>u4', count=number, offset=index)
+  return _ibm2ieee_arr(raw)
+
+def _ibm2ieee_arr(raw):
+  """
+  i raw : array, numpy uint32, raw IBM float bit patterns
+  o Value : array, numpy float32, same shape as raw
+  Vectorized IBM to IEEE conversion kernel.
+  Uses the fused Numba kernel when available, which avoids the
+  intermediate arrays the NumPy expressions below allocate.
+  """
+  if ibm2ieee_batch is not None:
+    raw = np.ascontiguousarray(raw, dtype=np.uint32) # native byte order
+    Value = np.empty(raw.shape, dtype=np.float32)
+    ibm2ieee_batch(raw.ravel(), Value.ravel())
+    return Value
+  sign = np.where(raw & 0x80000000, np.float32(-1.0), np.float32(1.0))
+  exponent = ((raw >> 24) & 0x7f).astype(np.int32) - 64
+  mantissa = (raw & 0x00ffffff).astype(np.float32) / np.float32(1 << 24)
+  # IBM base is 16, so the binary exponent is 4 * exponent.
+  # A zero mantissa yields zero, so no special case is needed.
+  return sign * np.ldexp(mantissa, 4 * exponent)
+
 def ibm2ieee(ibm_float):
   """
   i ibm_float : float, in IBM format
   o ieee_float : float, in IEEE format
-  Convert float IBM to IEEE.
+  Convert one float IBM to IEEE. Kept for single-value reads;
+  block conversion should use ibm2ieee_vec.
   """
   dividend = float(16**6)
   if ibm_float == 0:
@@ -813,6 +935,46 @@ def ibm2ieee(ibm_float):
   ieee_float = sign * 16**(istic-64) * (mant / dividend)
   return ieee_float
 
+def _makeSampleReader(np_dtype):
+  """
+  i np_dtype : string, big-endian numpy dtype of the stored samples
+  o reader : function, (data, ntraces, ns, traceByteSize) -> 2D array
+  Bind one sample-decoding function to its numpy dtype, so readSegy can
+  resolve the data sample format once per file and call a specialized
+  reader with no dtype branches in the hot path.
+  """
+  np_dtype = np.dtype(np_dtype)
+  bps = np_dtype.itemsize
+  def reader(data, ntraces, ns, traceByteSize):
+    # A strided view addresses just the samples of every trace, hopping
+    # over the 240-byte trace headers; astype byteswaps to native order
+    # in the same pass that copies out of the file buffer.
+    samples = np.ndarray(shape=(ntraces, ns), dtype=np_dtype, buffer=data,
+                         offset=bytes_SFH + bytes_STH,
+                         strides=(traceByteSize, bps))
+    return samples.astype(np_dtype.newbyteorder('='))
+  return reader
+
+def _readSamplesIbm(data, ntraces, ns, traceByteSize):
+  """
+  i data : bytes object, the whole file, e.g. an mmap
+  i ntraces, ns, traceByteSize : integers, file body layout
+  o Data : 2D array, numpy float32, ntraces by ns
+  Feed a strided uint32 view of the samples into the IBM kernel.
+  """
+  raw = np.ndarray(shape=(ntraces, ns), dtype='>u4', buffer=data,
+                   offset=bytes_SFH + bytes_STH,
+                   strides=(traceByteSize, 4))
+  return _ibm2ieee_arr(raw)
+
+# One sample-decoding function per data sample format, bound at import
+_SAMPLE_READERS = {
+  'ibm'    : _readSamplesIbm,
+  'int32'  : _makeSampleReader('>i4'),
+  'int16'  : _makeSampleReader('>i2'),
+  'float32': _makeSampleReader('>f4'),
+  'uchar'  : _makeSampleReader('u1')}
+
 def getBytePerSample(SH):
   """
   i SH : dictionary, Segy binary file header